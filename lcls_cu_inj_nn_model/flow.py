@@ -1,55 +1,99 @@
-import json
 import k2eg
 import math
+import orjson
 import os
 import torch
 
+from concurrent.futures import ThreadPoolExecutor
 from lume_model.models import TorchModule
+from pathlib import Path
 from prefect import flow, get_run_logger, task
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 
+# The model is evaluated on a single sample, where thread pool fork/join costs more than it saves
+torch.set_num_threads(1)
+try:
+    torch.set_num_interop_threads(1)
+except RuntimeError:
+    # The inter-op pool can only be sized once, before any inter-op work; keep any existing one
+    pass
+
 flow_dir = os.path.dirname(os.path.abspath(__file__))
 
 
+def _filter_input_pv_names(pv_names: Tuple[str, ...]) -> List[str]:
+    """ Select the live EPICS PVs the model takes as input from the full list of mapped PV names """
+    return [pv_name for pv_name in pv_names if ':' in pv_name and 'OTRS' not in pv_name]
+
+
+def _script_base_model(lume_module: TorchModule) -> TorchModule:
+    """ Swap the network wrapped by the lume module for a frozen TorchScript copy of it """
+    scripted_model = torch.jit.script(lume_module.model.model.eval())
+    scripted_model = torch.jit.optimize_for_inference(scripted_model)
+    lume_module.model.model = scripted_model
+    lume_module.base_model = scripted_model
+    return lume_module
+
+
+# Static PV name mapping shipped with the flow, parsed once per process rather than once per run
+_PV_NAMES = orjson.loads(Path(flow_dir, 'info/pv_mapping.json').read_bytes())['pv_name_to_sim_name']
+
+# Input PVs read live from EPICS in pv_mapping.json order, plus the camera PVs rdist is computed from
+_INPUT_PV_NAMES = tuple(pv_name for pv_name in _filter_input_pv_names(tuple(_PV_NAMES))
+                        if pv_name not in ('CAMR:IN20:186:R_DIST', 'Pulse_length'))
+_PVS_TO_READ = _INPUT_PV_NAMES + ('CAMR:IN20:186:XRMS', 'CAMR:IN20:186:YRMS')
+_K2EG_PVS_TO_READ = tuple('ca://' + pv_name for pv_name in _PVS_TO_READ)
+
+# Model built from the files shipped with the flow, loaded once per process rather than once per run
+_LUME_MODULE = _script_base_model(TorchModule(os.path.join(flow_dir, "model/pv_module.yml")).eval())
+
+# Column order the model expects its inputs in, unlike the pv_mapping.json order they are read in
+_INPUT_ORDER = tuple(_LUME_MODULE.input_order)
+
+# Input tensor reused by every run, filled in place through a numpy view that shares its memory
+_INPUT_VALUES = torch.empty((1, len(_INPUT_ORDER)), dtype=torch.float32)
+_INPUT_VALUES_ARRAY = _INPUT_VALUES.numpy()
+
+
 @task()
 def read_input_data(k2eg_client: k2eg.dml) -> Dict[str, float]:
     """ Read the input data our model expects from live PV values """
-    pv_names = json.load(open(os.path.join(flow_dir, 'info/pv_mapping.json')))['pv_name_to_sim_name']
     input_parameter_values = {'CAMR:IN20:186:R_DIST': None, 'Pulse_length': 1.8550514181818183}
 
-    for pv_name in pv_names.keys():
-        if pv_name not in input_parameter_values and 'OTRS' not in pv_name and ':' in pv_name:
-            input_parameter_values[pv_name] = None
-
-    k2eg_pvs_to_monitor = ['ca://' + pv for pv in input_parameter_values.keys() if
-                           pv not in ['CAMR:IN20:186:R_DIST', 'Pulse_length']]
+    # Issue all the reads at once so we wait on a single round trip rather than one per PV
+    with ThreadPoolExecutor(max_workers=len(_K2EG_PVS_TO_READ)) as executor:
+        pv_values = dict(zip(_PVS_TO_READ,
+                             executor.map(lambda pv: k2eg_client.get(pv, 5.0), _K2EG_PVS_TO_READ)))
 
-    for pv_name in k2eg_pvs_to_monitor:
-        input_parameter_values[pv_name.replace('ca://', '')] = k2eg_client.get(pv_name, 5.0)["value"]
+    for pv_name in _INPUT_PV_NAMES:
+        input_parameter_values[pv_name] = pv_values[pv_name]["value"]
 
-    in_xrms_value = k2eg_client.get('ca://CAMR:IN20:186:XRMS')["value"]
-    in_yrms_value = k2eg_client.get('ca://CAMR:IN20:186:YRMS')["value"]
-    rdist = math.sqrt(in_xrms_value ** 2 + in_yrms_value ** 2)
+    in_xrms_value = pv_values['CAMR:IN20:186:XRMS']["value"]
+    in_yrms_value = pv_values['CAMR:IN20:186:YRMS']["value"]
+    rdist = math.hypot(in_xrms_value, in_yrms_value)
     input_parameter_values['CAMR:IN20:186:R_DIST'] = rdist
 
     return input_parameter_values
 
 
-@task()
 def evaluate(lume_module: TorchModule, input_values: torch.Tensor) -> torch.Tensor:
     """ Run the trained model on the live data we retrieved """
-    with torch.no_grad():
+    with torch.inference_mode():
         predictions = lume_module(input_values)
 
     return predictions
 
 
-@task()
 def write_output(k2eg_client: k2eg.dml, predictions: torch.Tensor) -> None:
     """ Write the results of our predictions back to the relevant EPICS PVs """
-    k2eg_client.put('pva://LUME:OTRS:IN20:571:XRMS', predictions[0].item(), 5.0)
-    k2eg_client.put('pva://LUME:OTRS:IN20:571:YRMS', predictions[1].item(), 5.0)
+    prediction_values = predictions.detach().cpu().view(-1).tolist()
+    pv_writes = [('pva://LUME:OTRS:IN20:571:XRMS', prediction_values[0]),
+                 ('pva://LUME:OTRS:IN20:571:YRMS', prediction_values[1])]
+
+    # Issue both writes at once so we only wait on a single round trip
+    with ThreadPoolExecutor(max_workers=len(pv_writes)) as executor:
+        list(executor.map(lambda pv_write: k2eg_client.put(*pv_write, 5.0), pv_writes))
 
 
 @flow(name="lcls_cu_inj_nn_model_flow")
@@ -59,28 +103,31 @@ def lcls_cu_inj_nn_model_flow():
 
     logger.info(f'Results for torch.cuda.is_available(): {torch.cuda.is_available()}')
 
-    # Load the model we will run
-    lume_module = TorchModule(os.path.join(flow_dir, "model/pv_module.yml"))
+    # The model we will run is loaded once when this module is imported
+    lume_module = _LUME_MODULE
     logger.info(lume_module)
 
     # Read in PV data for our inputs
     os.environ['K2EG_PYTHON_CONFIGURATION_PATH_FOLDER'] = os.path.join(flow_dir, "k2eg")
     k2eg_client = k2eg.dml('env', 'app-test-3')
-    input_parameter_values = read_input_data(k2eg_client)
-    input_values = torch.tensor(list(input_parameter_values.values())).unsqueeze(0)
-
-    logger.info(f'Obtained live values from EPICS are as follows: {input_parameter_values}')
-    logger.info(f'Thus the input values to our model are: {input_values}')
+    try:
+        input_parameter_values = read_input_data(k2eg_client)
+        _INPUT_VALUES_ARRAY[0] = [input_parameter_values[pv_name] for pv_name in _INPUT_ORDER]
+        input_values = _INPUT_VALUES
 
-    predictions = evaluate(lume_module, input_values)
+        logger.info(f'Obtained live values from EPICS are as follows: {input_parameter_values}')
+        logger.info(f'Thus the input values to our model are: {input_values}')
 
-    logger.info(f'Predictions: {predictions}')
-    logger.info(predictions)
+        predictions = evaluate(lume_module, input_values)
 
-    # Write the output back to EPICS
-    write_output(k2eg_client, predictions)
+        logger.info(f'Predictions: {predictions}')
+        logger.info(predictions)
 
-    k2eg_client.close()
+        # Write the output back to EPICS
+        write_output(k2eg_client, predictions)
+    finally:
+        # k2eg's consumer thread is not a daemon, so the process can't exit until this is closed
+        k2eg_client.close()
 
 
 def get_flow():
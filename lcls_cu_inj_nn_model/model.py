@@ -1,5 +1,4 @@
-import copy
-from pydantic import SerializeAsAny
+from pydantic import Field, SerializeAsAny
 from typing import Dict
 from lume_model.base import LUMEBaseModel
 from lume_model.variables import InputVariable, OutputVariable
@@ -9,8 +8,12 @@ from lcls_cu_inj_nn_model import INPUT_VARIABLES, OUTPUT_VARIABLES
 
 
 class LCLSCuInjNNModel(LUMEBaseModel):
-    input_variables: list[SerializeAsAny[InputVariable]] = copy.deepcopy(INPUT_VARIABLES)
-    output_variables: list[SerializeAsAny[OutputVariable]] = copy.deepcopy(OUTPUT_VARIABLES)
+    input_variables: list[SerializeAsAny[InputVariable]] = Field(
+        default_factory=lambda: [var.model_copy(deep=True) for var in INPUT_VARIABLES]
+    )
+    output_variables: list[SerializeAsAny[OutputVariable]] = Field(
+        default_factory=lambda: [var.model_copy(deep=True) for var in OUTPUT_VARIABLES]
+    )
 
     def __init__(self, **settings_kwargs):
         """Initialize the model. If additional settings are required, they can be 
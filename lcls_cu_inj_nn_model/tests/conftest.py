@@ -0,0 +1,31 @@
+import pytest
+
+from lcls_cu_inj_nn_model.flow import _K2EG_PVS_TO_READ
+
+
+class FakeK2egClient:
+    """ Stand-in for k2eg.dml serving fixed PV values and recording every get, put and close """
+    def __init__(self, pv_values):
+        self.pv_values = pv_values
+        self.requested = []
+        self.written = {}
+        self.closed = False
+
+    def get(self, pv_url, timeout=None):
+        self.requested.append(pv_url)
+        return {"value": self.pv_values[pv_url.replace('ca://', '')]}
+
+    def put(self, pv_url, value, timeout=None):
+        self.written[pv_url] = value
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def k2eg_client():
+    # Distinct values for every PV so any value landing under the wrong name is caught
+    pv_values = {pv_url.replace('ca://', ''): float(i) for i, pv_url in enumerate(_K2EG_PVS_TO_READ)}
+    pv_values['CAMR:IN20:186:XRMS'] = 3.0
+    pv_values['CAMR:IN20:186:YRMS'] = 4.0
+    return FakeK2egClient(pv_values)
@@ -0,0 +1,42 @@
+import pytest
+import torch
+
+from prefect.testing.utilities import prefect_test_harness
+
+from lcls_cu_inj_nn_model import flow as flow_module
+from lcls_cu_inj_nn_model.flow import _INPUT_ORDER, lcls_cu_inj_nn_model_flow, read_input_data
+
+
+@pytest.fixture(scope="module", autouse=True)
+def prefect_backend():
+    with prefect_test_harness():
+        yield
+
+
+def test_flow_evaluates_inputs_in_model_input_order(k2eg_client, monkeypatch):
+    evaluated_inputs = []
+    evaluate = flow_module.evaluate
+
+    def recording_evaluate(lume_module, input_values):
+        evaluated_inputs.append(input_values.clone())
+        return evaluate(lume_module, input_values)
+
+    monkeypatch.setattr(flow_module.k2eg, 'dml', lambda *args: k2eg_client)
+    monkeypatch.setattr(flow_module, 'evaluate', recording_evaluate)
+
+    lcls_cu_inj_nn_model_flow()
+
+    input_parameter_values = read_input_data.fn(k2eg_client)
+    # The PVs are read in pv_mapping.json order, so this exercises reordering them into model columns
+    assert list(input_parameter_values) != list(_INPUT_ORDER)
+
+    assert len(evaluated_inputs) == 1
+    input_values = evaluated_inputs[0]
+    assert input_values.shape == (1, len(_INPUT_ORDER))
+    expected_values = torch.tensor([[input_parameter_values[pv_name] for pv_name in _INPUT_ORDER]])
+    for i, pv_name in enumerate(_INPUT_ORDER):
+        assert input_values[0, i] == expected_values[0, i], pv_name
+
+    assert sorted(k2eg_client.written) == ['pva://LUME:OTRS:IN20:571:XRMS',
+                                           'pva://LUME:OTRS:IN20:571:YRMS']
+    assert k2eg_client.closed
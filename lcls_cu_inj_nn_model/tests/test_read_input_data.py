@@ -0,0 +1,25 @@
+import math
+
+from lcls_cu_inj_nn_model.flow import _INPUT_ORDER, _K2EG_PVS_TO_READ, read_input_data
+
+
+def test_read_input_data_gets_each_pv_once(k2eg_client):
+    read_input_data.fn(k2eg_client)
+
+    assert sorted(k2eg_client.requested) == sorted(_K2EG_PVS_TO_READ)
+
+
+def test_read_input_data_values(k2eg_client):
+    input_parameter_values = read_input_data.fn(k2eg_client)
+
+    assert input_parameter_values['CAMR:IN20:186:R_DIST'] == math.hypot(3.0, 4.0)
+    assert input_parameter_values['Pulse_length'] == 1.8550514181818183
+    for pv_name, value in input_parameter_values.items():
+        if pv_name not in ('CAMR:IN20:186:R_DIST', 'Pulse_length'):
+            assert value == k2eg_client.pv_values[pv_name]
+
+
+def test_read_input_data_covers_model_inputs(k2eg_client):
+    input_parameter_values = read_input_data.fn(k2eg_client)
+
+    assert sorted(input_parameter_values) == sorted(_INPUT_ORDER)
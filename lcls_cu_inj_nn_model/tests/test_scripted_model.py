@@ -0,0 +1,24 @@
+import os
+import torch
+
+from lume_model.models import TorchModule
+from lcls_cu_inj_nn_model.flow import _LUME_MODULE, flow_dir
+
+
+def test_base_model_is_scripted():
+    # Guards against a lume-model change silently undoing the swap in _script_base_model
+    assert isinstance(_LUME_MODULE.model.model, torch.jit.ScriptModule)
+    assert _LUME_MODULE.base_model is _LUME_MODULE.model.model
+
+
+def test_scripted_predictions_match_eager():
+    eager_module = TorchModule(os.path.join(flow_dir, "model/pv_module.yml"))
+    input_variables = {var.name: var for var in eager_module.model.input_variables}
+    input_values = torch.tensor([
+        [input_variables[name].default for name in eager_module.input_order],
+        [input_variables[name].value_range[0] for name in eager_module.input_order],
+        [input_variables[name].value_range[1] for name in eager_module.input_order],
+    ])
+
+    with torch.inference_mode():
+        torch.testing.assert_close(_LUME_MODULE(input_values), eager_module(input_values))